@@ -1,6 +1,7 @@
 import google.generativeai as genai
 import os
 from dotenv import load_dotenv
+from model_cache import cached_list_models
 
 load_dotenv()
 
@@ -8,7 +9,7 @@ API_KEY = os.getenv("GEMINI_API_KEY")
 genai.configure(api_key=API_KEY)
 
 print("Listing ALL available models with full names:\n")
-for m in genai.list_models():
+for m in cached_list_models():
     if 'generateContent' in m.supported_generation_methods:
         print(f"Full name: {m.name}")
         print(f"Display name: {m.display_name}")
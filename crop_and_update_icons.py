@@ -1,5 +1,7 @@
 
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
 # Config
@@ -15,6 +17,22 @@ ICON_SIZES = {
     "mipmap-xxxhdpi": 192
 }
 
+def _emit(icon_source, folder, size):
+    target_dir = os.path.join(RES_DIR, folder)
+    os.makedirs(target_dir, exist_ok=True)
+
+    # High quality resize
+    resized_icon = icon_source.resize((size, size), Image.Resampling.LANCZOS)
+    
+    # Save
+    icon_path = os.path.join(target_dir, "ic_launcher.png")
+    resized_icon.save(icon_path, "PNG")
+    
+    round_icon_path = os.path.join(target_dir, "ic_launcher_round.png")
+    shutil.copyfile(icon_path, round_icon_path)  # Same bytes, skip a second PNG encode
+    
+    print(f"Generated {size}x{size} icons in {folder}")
+
 def crop_and_generate():
     if not os.path.exists(SOURCE_PATH):
         print(f"Error: Source image not found at {SOURCE_PATH}")
@@ -53,22 +71,9 @@ def crop_and_generate():
         # The user just said "crop it", but app icons are usually square (with full bleed) or round.
         # Standard Android adaptive icons are complicated. For now, just resizing the square crop is what was requested.
         
-        for folder, size in ICON_SIZES.items():
-            target_dir = os.path.join(RES_DIR, folder)
-            if not os.path.exists(target_dir):
-                os.makedirs(target_dir)
-
-            # High quality resize
-            resized_icon = icon_source.resize((size, size), Image.Resampling.LANCZOS)
-            
-            # Save
-            icon_path = os.path.join(target_dir, "ic_launcher.png")
-            resized_icon.save(icon_path, "PNG")
-            
-            round_icon_path = os.path.join(target_dir, "ic_launcher_round.png")
-            resized_icon.save(round_icon_path, "PNG")
-            
-            print(f"Generated {size}x{size} icons in {folder}")
+        # PIL releases the GIL while resizing and encoding, so sizes run in parallel
+        with ThreadPoolExecutor(max_workers=len(ICON_SIZES)) as executor:
+            list(executor.map(lambda item: _emit(icon_source, *item), ICON_SIZES.items()))
 
         print("✅ Icons regenerated from cropped logo!")
 
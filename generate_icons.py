@@ -1,5 +1,7 @@
 
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
 # Configuration
@@ -14,6 +16,24 @@ ICON_SIZES = {
     "mipmap-xxxhdpi": 192
 }
 
+def _save(folder, resized_img):
+    size = resized_img.width
+    target_dir = os.path.join(RES_DIR, folder)
+    if not os.path.exists(target_dir):
+        os.makedirs(target_dir, exist_ok=True)
+        print(f"Created directory: {target_dir}")
+
+    # Save as standard square icon
+    icon_path = os.path.join(target_dir, "ic_launcher.png")
+    resized_img.save(icon_path, "PNG")
+    
+    # Save as round icon (simple resize for now, proper adaptive icons need xml)
+    # For this request, we are just overwriting the pngs which is the standard request
+    round_icon_path = os.path.join(target_dir, "ic_launcher_round.png")
+    shutil.copyfile(icon_path, round_icon_path)  # Same bytes, skip a second PNG encode
+    
+    print(f"Generated {size}x{size} icons in {folder}")
+
 def generate_icons():
     if not os.path.exists(SOURCE_IMAGE_PATH):
         print(f"Error: Source image not found at {SOURCE_IMAGE_PATH}")
@@ -26,26 +46,19 @@ def generate_icons():
         
         print(f"Loaded source image: {img.size}")
 
-        for folder, size in ICON_SIZES.items():
-            target_dir = os.path.join(RES_DIR, folder)
-            if not os.path.exists(target_dir):
-                os.makedirs(target_dir)
-                print(f"Created directory: {target_dir}")
-
-            # Resize image
-            # Lanczos is high-quality downsampling
-            resized_img = img.resize((size, size), Image.Resampling.LANCZOS)
-            
-            # Save as standard square icon
-            icon_path = os.path.join(target_dir, "ic_launcher.png")
-            resized_img.save(icon_path, "PNG")
-            
-            # Save as round icon (simple resize for now, proper adaptive icons need xml)
-            # For this request, we are just overwriting the pngs which is the standard request
-            round_icon_path = os.path.join(target_dir, "ic_launcher_round.png")
-            resized_img.save(round_icon_path, "PNG")
-            
-            print(f"Generated {size}x{size} icons in {folder}")
+        # Resize image
+        # Lanczos is high-quality downsampling. Only the largest size reads the
+        # full source; smaller sizes each take one pass from that largest icon.
+        largest = max(ICON_SIZES.values())
+        base = img.resize((largest, largest), Image.Resampling.LANCZOS)
+        resized = {
+            folder: base if size == largest else base.resize((size, size), Image.Resampling.LANCZOS)
+            for folder, size in ICON_SIZES.items()
+        }
+
+        # PIL releases the GIL while encoding, so sizes are saved in parallel
+        with ThreadPoolExecutor(max_workers=len(resized)) as executor:
+            list(executor.map(lambda item: _save(*item), resized.items()))
 
         print("✅ App icons updated successfully!")
 
@@ -0,0 +1,53 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+import google.generativeai as genai
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "guidelens")
+MODEL_FIELDS = ("name", "display_name", "description", "supported_generation_methods")
+
+def _cache_path():
+    # Different keys can reach different models, so each key gets its own file
+    key_hash = hashlib.sha256((os.getenv("GEMINI_API_KEY") or "").encode()).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"models-{key_hash}.json")
+
+def cached_list_models(ttl=3600):
+    """
+    Return genai.list_models() results, reusing a local JSON copy for `ttl` seconds.
+    Models are returned as simple objects with the same attribute names.
+    The cache is kept per GEMINI_API_KEY.
+    """
+    cache_path = _cache_path()
+    try:
+        if time.time() - os.path.getmtime(cache_path) < ttl:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return [SimpleNamespace(**m) for m in json.load(f)]
+    except (OSError, ValueError):
+        pass  # Missing or unreadable cache, fetch fresh
+
+    models = [{field: getattr(m, field) for field in MODEL_FIELDS} for m in genai.list_models()]
+    for m in models:
+        m["supported_generation_methods"] = list(m["supported_generation_methods"])
+
+    # Write atomically via a unique temp file so concurrent runs never see
+    # (or clobber) a partial file. Caching is best effort.
+    tmp_path = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(models, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: could not write model cache: {e}")
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    return [SimpleNamespace(**m) for m in models]
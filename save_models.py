@@ -1,22 +1,24 @@
 import google.generativeai as genai
 import os
 from dotenv import load_dotenv
+from model_cache import cached_list_models
 
 load_dotenv()
 
 API_KEY = os.getenv("GEMINI_API_KEY")
 genai.configure(api_key=API_KEY)
 
+parts = ["Available Gemini Models:\n", "=" * 80 + "\n\n"]
+
+for m in cached_list_models():
+    if 'generateContent' in m.supported_generation_methods:
+        parts.append(f"Model Name: {m.name}\nDisplay Name: {m.display_name}\n")
+        if m.description:
+            parts.append(f"Description: {m.description}\n")
+        parts.append("-" * 80 + "\n\n")
+
+# Single write for the whole report
 with open("available_models.txt", "w", encoding="utf-8") as f:
-    f.write("Available Gemini Models:\n")
-    f.write("=" * 80 + "\n\n")
-    
-    for m in genai.list_models():
-        if 'generateContent' in m.supported_generation_methods:
-            f.write(f"Model Name: {m.name}\n")
-            f.write(f"Display Name: {m.display_name}\n")
-            if m.description:
-                f.write(f"Description: {m.description}\n")
-            f.write("-" * 80 + "\n\n")
+    f.write("".join(parts))
 
 print("Model information written to available_models.txt")
@@ -1,44 +1,69 @@
-from flask import Flask, request, jsonify
+from quart import Quart, Response, request, jsonify
 import google.generativeai as genai
 import os
 from dotenv import load_dotenv
+import asyncio
 import re
+from cachetools import TTLCache
 
 load_dotenv()
 
-app = Flask(__name__)
+app = Quart(__name__)
 
 # Configure Gemini with your key
 API_KEY = os.getenv("GEMINI_API_KEY")
 if not API_KEY:
     print("⚠️  Warning: GEMINI_API_KEY not found in environment variables")
     print("   Please add GEMINI_API_KEY to your .env file")
+# generate_content_async defaults to the grpc_asyncio transport: one persistent
+# HTTP/2 channel per process shared by every call, so TLS setup isn't paid per request
 genai.configure(api_key=API_KEY)
 
 # Use Gemini 2.5 Flash (Stable Version from June 2025)
 model = genai.GenerativeModel(
     model_name="models/gemini-2.5-flash",
     generation_config={
-        "temperature": 0.7,
+        # Answers are a single extractive line: keep them deterministic and let
+        # the newline stop end generation. The token cap stays generous because
+        # gemini-2.5-flash thinking tokens count against it.
+        "temperature": 0.2,
         "top_p": 0.95,
         "top_k": 40,
         "max_output_tokens": 1024,
+        "stop_sequences": ["\n"],
         "response_mime_type": "text/plain",
     }
 )
 
 # Common stop words to filter out
-STOP_WORDS = {
+STOP_WORDS = frozenset({
     'the', 'is', 'are', 'was', 'were', 'a', 'an', 'and', 'or', 'but',
     'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from', 'it',
     'this', 'that', 'these', 'those', 'use', 'used', 'take'
-}
+})
 
-# Medical keywords to prioritize
-MEDICAL_KEYWORDS = {
+# Medical keywords to prioritize (only used to build _MEDICAL_RE)
+MEDICAL_KEYWORDS = frozenset({
     'mg', 'ml', 'tablet', 'capsule', 'syrup', 'medicine', 'drug', 'pill',
     'dose', 'dosage', 'prescription', 'relief', 'pain', 'fever'
-}
+})
+
+# Precompiled patterns used by filter_text on every request
+_NON_ALNUM = re.compile(r'[^a-zA-Z0-9]')
+_HAS_DIGIT = re.compile(r'\d')
+_MEDICAL_RE = re.compile('|'.join(sorted(MEDICAL_KEYWORDS, key=len, reverse=True)))
+
+def _is_relevant(word: str, cleaned: str) -> bool:
+    """
+    Keep if: not empty or a stop word, and has numbers (dosage), medical
+    keyword, or capitalized (brand name).
+    """
+    lower = cleaned.lower()
+    if not cleaned or lower in STOP_WORDS:
+        return False
+    return bool(_HAS_DIGIT.search(cleaned) or
+                _MEDICAL_RE.search(lower) or
+                (word[0].isupper() and len(cleaned) > 2))
 
 def filter_text(text: str) -> str:
     """
@@ -48,31 +73,210 @@ def filter_text(text: str) -> str:
     if not text or len(text.strip()) == 0:
         return text
     
-    words = text.split()
     filtered_words = []
     
-    for word in words:
-        # Remove special characters but keep alphanumeric
-        cleaned = re.sub(r'[^a-zA-Z0-9]', '', word)
-        lower = cleaned.lower()
-        
-        # Skip empty or stop words
-        if not cleaned or lower in STOP_WORDS:
-            continue
-        
-        # Keep if: has numbers (dosage), medical keyword, or capitalized (brand name)
-        if (re.search(r'\d', cleaned) or 
-            any(keyword in lower for keyword in MEDICAL_KEYWORDS) or
-            (word[0].isupper() and len(cleaned) > 2)):
+    for word in text.split():
+        # Remove special characters but keep alphanumeric, so OCR-hyphenated
+        # words like "Para-cetamol" stay whole
+        cleaned = _NON_ALNUM.sub('', word)
+        if _is_relevant(word, cleaned):
             filtered_words.append(cleaned)
+            if len(filtered_words) == 4:
+                break
     
-    # Limit to 4 most relevant words
-    result = ' '.join(filtered_words[:4])
+    # Keep up to 4 most relevant words
+    result = ' '.join(filtered_words)
     print(f"   Filtered: '{text}' → '{result}'")
     return result if result else text  # Return original if nothing left
 
+# Cache of identified medicines keyed by normalized filtered text.
+# Each server worker process keeps its own copy.
+CACHE = TTLCache(maxsize=10_000, ttl=86_400)
+
+# Micro-batching: concurrent /identify requests share one Gemini call
+BATCH_MAX_SIZE = 8
+BATCH_WINDOW_SECONDS = 0.05
+_LIST_PREFIX = re.compile(r'^\s*(\d+)[.)]\s*')
+_BATCHABLE_TEXT = re.compile(r'[A-Za-z0-9]+(?: [A-Za-z0-9]+)*')
+_batch_queue = None
+_batch_tasks = set()
+
+def build_prompt(filtered_text: str) -> str:
+    """Prompt for identifying a single medicine."""
+    return f"""
+Scanned text from medicine package: "{filtered_text}"
+
+Identify the medicine and provide a ONE-LINE response in this exact format:
+[Medicine Name] - [Primary Use]
+
+Example: "Paracetamol 500mg - Pain and fever relief"
+
+Keep it extremely concise. No warnings or additional information.
+"""
+
+def build_batch_prompt(texts: list) -> str:
+    """Prompt for identifying several medicines, answered one per line."""
+    items = '\n'.join(f'{i}. "{text}"' for i, text in enumerate(texts, 1))
+    return f"""
+Scanned texts from {len(texts)} different medicine packages:
+{items}
+
+Identify each medicine, one per line, numbered in the same order, in this exact format:
+1. [Medicine Name] - [Primary Use]
+
+Example: "1. Paracetamol 500mg - Pain and fever relief"
+
+Keep each line extremely concise. No warnings or additional information.
+"""
+
+async def _identify_single(filtered_text: str) -> str:
+    response = await model.generate_content_async(build_prompt(filtered_text))
+    return ' '.join(response.text.split())
+
+def parse_batch_reply(text: str, count: int):
+    """
+    Map each numbered line of a batch reply to its item by index.
+    Returns the answers in item order, or None unless lines 1..count each
+    appear exactly once.
+    """
+    answers = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        match = _LIST_PREFIX.match(line)
+        if not match:
+            return None
+        index = int(match.group(1))
+        answer = ' '.join(line[match.end():].split())
+        if index in answers or not 1 <= index <= count or not answer:
+            return None
+        answers[index] = answer
+    if len(answers) != count:
+        return None
+    return [answers[i] for i in range(1, count + 1)]
+
+async def _run_batch(batch: list):
+    """
+    Resolve every (text, future) pair in the batch with one Gemini call.
+    If that call fails or its reply can't be mapped back, each item is asked
+    individually so one bad scan only fails its own request.
+    """
+    texts = [text for text, _ in batch]
+    results = None
+    if len(batch) > 1:
+        print(f"📦 Batching {len(batch)} requests into one Gemini call")
+        try:
+            # Batched replies span one line per item; thinking tokens also
+            # count against the cap, so scale it with the batch
+            response = await model.generate_content_async(
+                build_batch_prompt(texts),
+                generation_config={
+                    "max_output_tokens": 1024 * len(batch),
+                    "stop_sequences": [],
+                }
+            )
+            results = parse_batch_reply(response.text, len(batch))
+            if results is None:
+                print(f"⚠️  Batch reply didn't number all {len(batch)} items, retrying individually")
+        except Exception as e:
+            print(f"⚠️  Batch call failed ({e}), retrying individually")
+
+    if results is None:
+        results = await asyncio.gather(*(_identify_single(t) for t in texts),
+                                       return_exceptions=True)
+
+    for (_, future), result in zip(batch, results):
+        if future.done():
+            continue
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+async def _batch_worker():
+    """Collect pending requests for up to BATCH_WINDOW_SECONDS or BATCH_MAX_SIZE items."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _batch_queue.get()]
+        deadline = loop.time() + BATCH_WINDOW_SECONDS
+        while len(batch) < BATCH_MAX_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_batch_queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        # Don't hold up the next batch while this one waits on Gemini
+        task = loop.create_task(_run_batch(batch))
+        _batch_tasks.add(task)
+        task.add_done_callback(_batch_tasks.discard)
+
+@app.before_serving
+async def start_batch_worker():
+    global _batch_queue
+    _batch_queue = asyncio.Queue()
+    app.batch_worker = asyncio.create_task(_batch_worker())
+
+@app.after_serving
+async def stop_batch_worker():
+    app.batch_worker.cancel()
+
+async def identify_medicine(filtered_text: str) -> str:
+    """Queue the text for the next batch and wait for its result."""
+    # Raw OCR fallbacks may carry quotes or newlines that could steer other
+    # users' answers in a shared prompt, so only clean keyword text is batched
+    if not _BATCHABLE_TEXT.fullmatch(filtered_text):
+        return await _identify_single(filtered_text)
+    
+    future = asyncio.get_running_loop().create_future()
+    await _batch_queue.put((filtered_text, future))
+    return await future
+
+def error_response(e: Exception):
+    """Map an exception from the Gemini call to a JSON error response."""
+    error_msg = str(e)
+    print(f"❌ Error: {error_msg}")
+    
+    # Check for specific Gemini API errors
+    if "quota" in error_msg.lower() or "limit" in error_msg.lower():
+        return jsonify({
+            'result': None,
+            'error': 'API quota exceeded. Please try again later.'
+        }), 429
+    
+    return jsonify({
+        'result': None,
+        'error': f'Server error: {error_msg}'
+    }), 500
+
+async def read_filtered_text():
+    """
+    Read and filter the 'text' field of an /identify request body.
+    Returns (filtered_text, None), or (None, error response) if unusable.
+    """
+    data = await request.get_json()
+    if not data or 'text' not in data:
+        return None, (jsonify({'error': 'No text provided'}), 400)
+    
+    raw_text = data['text']
+    print(f"\n📝 Received raw text: {raw_text}")
+    
+    # Filter text to get relevant keywords
+    filtered_text = filter_text(raw_text)
+    print(f"🔍 Using filtered text: {filtered_text}")
+    
+    # Check if we have valid text to analyze
+    if not filtered_text or len(filtered_text.strip()) < 2:
+        return None, (jsonify({
+            'result': None,
+            'error': 'No meaningful text detected after filtering'
+        }), 400)
+    
+    return filtered_text, None
+
 @app.route('/health', methods=['GET'])
-def health():
+async def health():
     """Health check endpoint for connectivity testing"""
     return jsonify({
         'status': 'ok',
@@ -81,64 +285,95 @@ def health():
     }), 200
 
 @app.route('/identify', methods=['POST'])
-def identify():
+async def identify():
     try:
-        data = request.json
-        if not data or 'text' not in data:
-            return jsonify({'error': 'No text provided'}), 400
-        
-        raw_text = data['text']
-        print(f"\n📝 Received raw text: {raw_text}")
+        filtered_text, invalid = await read_filtered_text()
+        if invalid:
+            return invalid
         
-        # Filter text to get relevant keywords
-        filtered_text = filter_text(raw_text)
-        print(f"🔍 Using filtered text: {filtered_text}")
-        
-        # Check if we have valid text to analyze
-        if not filtered_text or len(filtered_text.strip()) < 2:
+        # Repeat scans of the same medicine skip Gemini entirely
+        cache_key = filtered_text.lower()
+        if cache_key in CACHE:
+            result = CACHE[cache_key]
+            print(f"⚡ Cached Response: {result}")
             return jsonify({
-                'result': None,
-                'error': 'No meaningful text detected after filtering'
-            }), 400
+                'result': result,
+                'error': None,
+                'filtered_text': filtered_text,
+                'cached': True
+            }), 200
         
-        # Create prompt for Gemini
-        prompt = f"""
-Scanned text from medicine package: "{filtered_text}"
-
-Identify the medicine and provide a ONE-LINE response in this exact format:
-[Medicine Name] - [Primary Use]
-
-Example: "Paracetamol 500mg - Pain and fever relief"
-
-Keep it extremely concise. No warnings or additional information.
-"""
-        
-        # Call Gemini API
-        response = model.generate_content(prompt)
-        result = response.text.replace('\n', ' ').strip()
+        # Call Gemini API (batched with any concurrent requests)
+        result = await identify_medicine(filtered_text)
+        if result:
+            CACHE[cache_key] = result
         
         print(f"✅ AI Response: {result}")
         return jsonify({
             'result': result,
             'error': None,
-            'filtered_text': filtered_text
+            'filtered_text': filtered_text,
+            'cached': False
         }), 200
         
     except Exception as e:
-        error_msg = str(e)
-        print(f"❌ Error: {error_msg}")
+        return error_response(e)
+
+@app.route('/identify/stream', methods=['POST'])
+async def identify_stream():
+    """
+    Same as /identify but streams the answer as text/plain while Gemini
+    generates it. Not batched, since each reply is flushed as it arrives.
+    """
+    try:
+        filtered_text, invalid = await read_filtered_text()
+        if invalid:
+            return invalid
         
-        # Check for specific Gemini API errors
-        if "quota" in error_msg.lower() or "limit" in error_msg.lower():
-            return jsonify({
-                'result': None,
-                'error': 'API quota exceeded. Please try again later.'
-            }), 429
+        cache_key = filtered_text.lower()
+        if cache_key in CACHE:
+            return Response(CACHE[cache_key], mimetype='text/plain')
         
-        return jsonify({
-            'result': None,
-            'error': f'Server error: {error_msg}'
-        }), 500
+        response = await model.generate_content_async(build_prompt(filtered_text), stream=True)
+        
+        # Read ahead to the first chunk with text before sending headers, so
+        # API errors and empty replies (e.g. MAX_TOKENS) still map to status
+        # codes. Finish-reason-only chunks have no parts and chunk.text raises.
+        chunks = response.__aiter__()
+        first = ''
+        while not first.strip():
+            try:
+                chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                raise ValueError('Gemini returned no text')
+            if chunk.parts:
+                first = chunk.text
+        
+    except Exception as e:
+        return error_response(e)
+    
+    async def generate():
+        # The model's "\n" stop sequence ends the single-line answer server-side
+        parts = [first]
+        yield first
+        try:
+            async for chunk in chunks:
+                if not chunk.parts:
+                    continue
+                parts.append(chunk.text)
+                yield chunk.text
+        except Exception as e:
+            # Headers are already sent, so just end the body and skip caching
+            print(f"❌ Stream Error: {e}")
+            return
+        
+        # Normalized the same way as /identify so both routes cache equal strings
+        result = ' '.join(''.join(parts).split())
+        if result:
+            CACHE[cache_key] = result
+        print(f"✅ AI Response (stream): {result}")
+    
+    return Response(generate(), mimetype='text/plain')
 
 if __name__ == '__main__':
     print("=" * 60)
@@ -151,6 +386,9 @@ if __name__ == '__main__':
     print("\nEndpoints:")
     print("  GET  /health   - Health check")
     print("  POST /identify - Medicine identification")
+    print("  POST /identify/stream - Medicine identification (streamed)")
     print("\n✅ Server is ready!\n")
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Local testing only; the supported entry point is an ASGI server:
+    #   hypercorn server:app --bind 0.0.0.0:5000 --workers 4
+    app.run(host='0.0.0.0', port=5000, debug=False)
 